@@ -0,0 +1,525 @@
+# Copyright 2022 The Kubeflow Authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+import time
+from typing import Callable, List, Dict, Any
+from kubernetes_asyncio import client, config
+
+from kubeflow.training.constants import constants
+from kubeflow.training.utils import utils
+from kubeflow.training.api.paddle_job_client import PaddleJobClient
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncPaddleJobClient(object):
+    def __init__(
+        self,
+        config_file=None,
+        context=None,  # pylint: disable=too-many-arguments
+        client_configuration=None,
+        persist_config=True,
+    ):
+        """
+        Asyncio PaddleJob client constructor. Requires the `kubernetes_asyncio`
+        package, install it with `pip install kubeflow-training[async]`.
+        The Kubernetes configuration is loaded on the first API call.
+        :param config_file: kubeconfig file, defaults to ~/.kube/config
+        :param context: Kubernetes context
+        :param client_configuration: configuration for Kubernetes client
+        :param persist_config:
+        """
+        self.config_file = config_file
+        self.context = context
+        self.client_configuration = client_configuration
+        self.persist_config = persist_config
+
+        self.api_client = None
+        self.custom_api = None
+        self.core_api = None
+        # Created on first use, so the client can be built outside an event loop.
+        self._load_lock = None
+
+    async def __aenter__(self):
+        await self._load_apis()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def _load_apis(self):
+        """Load the Kubernetes configuration and build the API objects once."""
+        if self.api_client is not None:
+            return
+
+        if self._load_lock is None:
+            self._load_lock = asyncio.Lock()
+        # Concurrent first calls must not build several ApiClients, only the
+        # last one would be closed.
+        async with self._load_lock:
+            if self.api_client is not None:
+                return
+
+            if self.config_file or not utils.is_running_in_k8s():
+                await config.load_kube_config(
+                    config_file=self.config_file,
+                    context=self.context,
+                    client_configuration=self.client_configuration,
+                    persist_config=self.persist_config,
+                )
+            else:
+                config.load_incluster_config(
+                    client_configuration=self.client_configuration
+                )
+
+            # The configuration is loaded into client_configuration if it is
+            # given, otherwise into the default configuration.
+            api_client = client.ApiClient(configuration=self.client_configuration)
+            self.custom_api = client.CustomObjectsApi(api_client)
+            self.core_api = client.CoreV1Api(api_client)
+            self.api_client = api_client
+
+    async def close(self):
+        """Close the underlying HTTP session."""
+        if self.api_client is not None:
+            await self.api_client.close()
+            self.api_client = None
+            self.custom_api = None
+            self.core_api = None
+
+    async def create(self, paddlejob, namespace=None):
+        """
+        Create the PaddleJob
+        :param paddlejob: PaddleJob object or dict
+        :param namespace: defaults to current or default namespace
+        """
+        if namespace is None:
+            namespace = utils.get_default_target_namespace()
+
+        await self._load_apis()
+        try:
+            await self.custom_api.create_namespaced_custom_object(
+                constants.KUBEFLOW_GROUP,
+                constants.PADDLEJOB_VERSION,
+                namespace,
+                constants.PADDLEJOB_PLURAL,
+                paddlejob,
+            )
+        except client.rest.ApiException as e:
+            raise RuntimeError(
+                "Exception when calling CustomObjectsApi->create_namespaced_custom_object:\
+                 %s\n"
+                % e
+            )
+
+        if isinstance(paddlejob, dict):
+            paddlejob_name = paddlejob["metadata"]["name"]
+        else:
+            paddlejob_name = paddlejob.metadata.name
+        logger.info("PaddleJob %s has been created", paddlejob_name)
+
+    async def create_paddlejob_from_func(
+        self,
+        name: str,
+        func: Callable,
+        parameters: Dict[str, Any] = None,
+        base_image: str = constants.PADDLEJOB_BASE_IMAGE,
+        namespace: str = None,
+        num_worker_replicas: int = None,
+        packages_to_install: List[str] = None,
+        pip_index_url: str = "https://pypi.org/simple",
+    ):
+        """Create PaddleJob from the function.
+
+        See PaddleJobClient.create_paddlejob_from_func for the arguments.
+        """
+
+        # Check if at least one worker replica is set.
+        if num_worker_replicas is None:
+            raise ValueError("At least one Worker replica for PaddleJob must be set")
+
+        if namespace is None:
+            namespace = utils.get_default_target_namespace()
+
+        # Get PaddleJob Pod template spec.
+        pod_template_spec = utils.get_pod_template_spec_dict(
+            func=func,
+            parameters=parameters,
+            base_image=base_image,
+            container_name="paddle",
+            packages_to_install=packages_to_install,
+            pip_index_url=pip_index_url,
+        )
+
+        # Create PaddleJob template.
+        paddlejob = {
+            "apiVersion": f"{constants.KUBEFLOW_GROUP}/{constants.PADDLEJOB_VERSION}",
+            "kind": constants.PADDLEJOB_KIND,
+            "metadata": {"name": name, "namespace": namespace},
+            "spec": {
+                "runPolicy": {},
+                "paddleReplicaSpecs": {},
+            },
+        }
+
+        # Add Master and Worker replicas to the PaddleJob. Both replicas reference
+        # the same Pod template dict on purpose, copy it with copy.deepcopy before
+        # changing the template of only one replica.
+        paddlejob["spec"]["paddleReplicaSpecs"]["Master"] = {
+            "replicas": 1,
+            "template": pod_template_spec,
+        }
+
+        # If number of Worker replicas is 1, PaddleJob uses only Master replica.
+        if num_worker_replicas != 1:
+            paddlejob["spec"]["paddleReplicaSpecs"]["Worker"] = {
+                "replicas": num_worker_replicas,
+                "template": pod_template_spec,
+            }
+
+        # Create PaddleJob
+        await self.create(paddlejob=paddlejob, namespace=namespace)
+
+    async def get(self, name=None, namespace=None):
+        """
+        Get the paddlejob
+        :param name: existing paddlejob name, if not defined, get all paddlejobs in the namespace.
+        :param namespace: defaults to current or default namespace
+        :return: paddlejob
+        """
+        if namespace is None:
+            namespace = utils.get_default_target_namespace()
+
+        await self._load_apis()
+        if name:
+            try:
+                return await asyncio.wait_for(
+                    self.custom_api.get_namespaced_custom_object(
+                        constants.KUBEFLOW_GROUP,
+                        constants.PADDLEJOB_VERSION,
+                        namespace,
+                        constants.PADDLEJOB_PLURAL,
+                        name,
+                    ),
+                    constants.APISERVER_TIMEOUT,
+                )
+            except asyncio.TimeoutError:
+                raise RuntimeError("Timeout trying to get PaddleJob.")
+            except client.rest.ApiException as e:
+                raise RuntimeError(
+                    "Exception when calling CustomObjectsApi->get_namespaced_custom_object:\
+                    %s\n"
+                    % e
+                )
+            except Exception as e:
+                raise RuntimeError(
+                    "There was a problem to get PaddleJob {0} in namespace {1}. Exception: \
+                    {2} ".format(
+                        name, namespace, e
+                    )
+                )
+        else:
+            try:
+                return await asyncio.wait_for(
+                    self.custom_api.list_namespaced_custom_object(
+                        constants.KUBEFLOW_GROUP,
+                        constants.PADDLEJOB_VERSION,
+                        namespace,
+                        constants.PADDLEJOB_PLURAL,
+                    ),
+                    constants.APISERVER_TIMEOUT,
+                )
+            except asyncio.TimeoutError:
+                raise RuntimeError("Timeout trying to get PaddleJob.")
+            except client.rest.ApiException as e:
+                raise RuntimeError(
+                    "Exception when calling CustomObjectsApi->list_namespaced_custom_object: \
+                    %s\n"
+                    % e
+                )
+            except Exception as e:
+                raise RuntimeError(
+                    "There was a problem to List PaddleJob in namespace {0}. \
+                    Exception: {1} ".format(
+                        namespace, e
+                    )
+                )
+
+    async def patch(self, name, paddlejob, namespace=None):
+        """
+        Patch existing paddlejob
+        :param name: existing paddlejob name
+        :param paddlejob: patched paddlejob
+        :param namespace: defaults to current or default namespace
+        :return: patched paddlejob
+        """
+        if namespace is None:
+            namespace = utils.set_paddlejob_namespace(paddlejob)
+
+        await self._load_apis()
+        try:
+            outputs = await self.custom_api.patch_namespaced_custom_object(
+                constants.KUBEFLOW_GROUP,
+                constants.PADDLEJOB_VERSION,
+                namespace,
+                constants.PADDLEJOB_PLURAL,
+                name,
+                paddlejob,
+            )
+        except client.rest.ApiException as e:
+            raise RuntimeError(
+                "Exception when calling CustomObjectsApi->patch_namespaced_custom_object:\
+                 %s\n"
+                % e
+            )
+
+        return outputs
+
+    async def delete(self, name, namespace=None):
+        """
+        Delete the PaddleJob
+        :param name: PaddleJob name
+        :param namespace: defaults to current or default namespace
+        """
+        if namespace is None:
+            namespace = utils.get_default_target_namespace()
+
+        await self._load_apis()
+        try:
+            await self.custom_api.delete_namespaced_custom_object(
+                group=constants.KUBEFLOW_GROUP,
+                version=constants.PADDLEJOB_VERSION,
+                namespace=namespace,
+                plural=constants.PADDLEJOB_PLURAL,
+                name=name,
+                body=client.V1DeleteOptions(),
+            )
+        except client.rest.ApiException as e:
+            raise RuntimeError(
+                "Exception when calling CustomObjectsApi->delete_namespaced_custom_object:\
+                 %s\n"
+                % e
+            )
+
+        logger.info("PaddleJob %s has been deleted", name)
+
+    async def wait_for_job(
+        self,
+        name,
+        namespace=None,
+        timeout_seconds=600,
+        polling_interval=30,
+        status_callback=None,
+    ):
+        """Wait for the specified job to finish.
+
+        :param name: Name of the PaddleJob.
+        :param namespace: defaults to current or default namespace.
+        :param timeout_seconds: How long to wait for the job.
+        :param polling_interval: How often to poll for the status of the job.
+        :param status_callback: (Optional): Callable. If supplied this callable is
+               invoked after we poll the job. Callable takes a single argument which
+               is the job.
+        :return: Object: PaddleJob
+        """
+        return await self.wait_for_condition(
+            name,
+            ["Succeeded", "Failed"],
+            namespace=namespace,
+            timeout_seconds=timeout_seconds,
+            polling_interval=polling_interval,
+            status_callback=status_callback,
+        )
+
+    async def wait_for_condition(
+        self,
+        name,
+        expected_condition,
+        namespace=None,
+        timeout_seconds=600,
+        polling_interval=30,
+        status_callback=None,
+    ):
+        """Waits until any of the specified conditions occur.
+
+        :param name: Name of the job.
+        :param expected_condition: A list of conditions. Function waits until any of the
+               supplied conditions is reached.
+        :param namespace: defaults to current or default namespace.
+        :param timeout_seconds: How long to wait for the job.
+        :param polling_interval: How often to poll for the status of the job.
+        :param status_callback: (Optional): Callable. If supplied this callable is
+               invoked after we poll the job. Callable takes a single argument which
+               is the job.
+        :return: Object: PaddleJob
+        """
+
+        if namespace is None:
+            namespace = utils.get_default_target_namespace()
+
+        deadline = time.monotonic() + timeout_seconds
+        expected = frozenset(expected_condition)
+        while True:
+            paddlejob = await self.get(name, namespace=namespace)
+
+            if paddlejob:
+                if status_callback:
+                    status_callback(paddlejob)
+
+                if PaddleJobClient._has_condition(paddlejob, expected):
+                    return paddlejob
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            await asyncio.sleep(min(polling_interval, remaining))
+
+        raise RuntimeError(
+            "Timeout waiting for PaddleJob {0} in namespace {1} to enter one of the "
+            "conditions {2}.".format(name, namespace, expected_condition),
+            paddlejob,
+        )
+
+    async def get_job_status(self, name, namespace=None):
+        """Returns PaddleJob status, such as Running, Failed or Succeeded.
+
+        :param name: The PaddleJob name.
+        :param namespace: defaults to current or default namespace.
+        :return: str: PaddleJob status, empty if the PaddleJob has no conditions yet
+        """
+        paddlejob = await self.get(name, namespace=namespace)
+        return PaddleJobClient._get_last_condition_type(paddlejob)
+
+    async def is_job_running(self, name, namespace=None):
+        """Returns true if the PaddleJob running; false otherwise.
+
+        :param name: The PaddleJob name.
+        :param namespace: defaults to current or default namespace.
+        :return: True or False
+        """
+        paddlejob_status = await self.get_job_status(name, namespace=namespace)
+        return paddlejob_status == constants.JOB_STATUS_RUNNING
+
+    async def is_job_succeeded(self, name, namespace=None):
+        """Returns true if the PaddleJob succeeded; false otherwise.
+
+        :param name: The PaddleJob name.
+        :param namespace: defaults to current or default namespace.
+        :return: True or False
+        """
+        paddlejob_status = await self.get_job_status(name, namespace=namespace)
+        return paddlejob_status == constants.JOB_STATUS_SUCCEEDED
+
+    async def get_pod_names(
+        self, name, namespace=None, master=False, replica_type=None, replica_index=None,
+    ):
+        """
+        Get pod names of PaddleJob.
+        :param name: PaddleJob name
+        :param namespace: defaults to current or default namespace.
+        :param master: Only get pod with label 'job-role: master' pod if True.
+        :param replica_type: User can specify one of 'master, worker' to only get one type pods.
+               By default get all type pods.
+        :param replica_index: User can specfy replica index to get one pod of PaddleJob.
+        :return: set: pods name
+        """
+
+        if namespace is None:
+            namespace = utils.get_default_target_namespace()
+
+        labels = utils.get_job_labels(
+            name, master=master, replica_type=replica_type, replica_index=replica_index
+        )
+
+        await self._load_apis()
+        try:
+            resp = await self.core_api.list_namespaced_pod(
+                namespace, label_selector=utils.to_selector(labels)
+            )
+        except client.rest.ApiException as e:
+            raise RuntimeError(
+                "Exception when calling CoreV1Api->list_namespaced_pod: %s\n" % e
+            )
+
+        pod_names = set()
+        for pod in resp.items:
+            if pod.metadata and pod.metadata.name:
+                pod_names.add(pod.metadata.name)
+
+        if not pod_names:
+            logger.warning(
+                "Not found Pods of the PaddleJob %s with the labels %s.", name, labels
+            )
+        return pod_names
+
+    async def get_logs(
+        self,
+        name,
+        namespace=None,
+        master=False,
+        replica_type=None,
+        replica_index=None,
+        follow=False,
+        container="paddle",
+    ):
+        """
+        Get training logs of the PaddleJob.
+        The logs of all matching Pods are fetched concurrently.
+        :param container: container name
+        :param name: PaddleJob name
+        :param namespace: defaults to current or default namespace.
+        :param master: By default get pod with label 'job-role: master' pod if True.
+                       If need to get more Pod Logs, set False.
+        :param replica_type: User can specify one of 'master, worker' to only get one type pods.
+               By default get all type pods.
+        :param replica_index: User can specfy replica index to get one pod of PaddleJob.
+        :param follow: Follow the log stream of the pod. Defaults to false.
+        """
+
+        if namespace is None:
+            namespace = utils.get_default_target_namespace()
+
+        pod_names = await self.get_pod_names(
+            name,
+            namespace=namespace,
+            master=master,
+            replica_type=replica_type,
+            replica_index=replica_index,
+        )
+
+        if not pod_names:
+            raise RuntimeError(
+                "Not found Pods of the PaddleJob {} "
+                "in namespace {}".format(name, namespace)
+            )
+
+        pod_names = list(pod_names)
+        try:
+            pods_logs = await asyncio.gather(
+                *[
+                    self.core_api.read_namespaced_pod_log(
+                        pod, namespace, follow=follow, container=container
+                    )
+                    for pod in pod_names
+                ]
+            )
+        except client.rest.ApiException as e:
+            raise RuntimeError(
+                "Exception when calling CoreV1Api->read_namespaced_pod_log: %s\n" % e
+            )
+
+        for pod, pod_logs in zip(pod_names, pods_logs):
+            logger.info("The logs of Pod %s:\n %s", pod, pod_logs)
@@ -12,19 +12,116 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import multiprocessing
+import asyncio
+import codecs
+import functools
+import math
+import queue
+import socket
+import threading
 import time
 import logging
-from typing import Callable, List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, Dict, Any, Optional, Tuple
 from kubernetes import client, config
+from kubernetes import watch as k8s_watch
+from urllib3.exceptions import HTTPError, MaxRetryError
+from urllib3.exceptions import TimeoutError as HTTPTimeoutError
 
 from kubeflow.training.constants import constants
 from kubeflow.training.utils import utils
-from kubeflow.training import models
 from kubeflow.training.api.paddle_job_watch import watch as paddlejob_watch
 
-logging.basicConfig(format="%(message)s")
-logging.getLogger().setLevel(logging.INFO)
+logger = logging.getLogger(__name__)
+
+# The default namespace only depends on the environment the client runs in,
+# so it is looked up once instead of on every call.
+_default_namespace = functools.lru_cache(maxsize=1)(
+    utils.get_default_target_namespace
+)
+
+
+def invalidate_default_namespace_cache():
+    """Forget the cached default namespace, so the next call looks it up again."""
+    _default_namespace.cache_clear()
+
+
+@functools.lru_cache(maxsize=256)
+def _selector_for(name, master, replica_type, replica_index):
+    """Returns the label selector of the job Pods, labels only depend on the args."""
+    return utils.to_selector(
+        utils.get_job_labels(
+            name, master=master, replica_type=replica_type, replica_index=replica_index
+        )
+    )
+
+
+# ApiClient objects shared by the PaddleJobClient instances without their own
+# client configuration, keyed by the (config_file, context, persist_config) they
+# were loaded with. An ApiClient is thread-safe and owns a urllib3 connection
+# pool, so there is no need to build one per client.
+_shared_api_clients = {}
+_shared_api_clients_lock = threading.Lock()
+
+
+def _load_api_client(
+    config_file=None, context=None, client_configuration=None, persist_config=True
+):
+    """Load the Kubernetes configuration and return a new ApiClient using it."""
+    if config_file or not utils.is_running_in_k8s():
+        config.load_kube_config(
+            config_file=config_file,
+            context=context,
+            client_configuration=client_configuration,
+            persist_config=persist_config,
+        )
+    else:
+        config.load_incluster_config(client_configuration=client_configuration)
+    # The configuration is loaded into client_configuration if it is given,
+    # otherwise into the default configuration.
+    return client.ApiClient(configuration=client_configuration)
+
+
+def _get_shared_api_client(config_file=None, context=None, persist_config=True):
+    """Load the Kubernetes configuration once and return the shared ApiClient."""
+    key = (config_file, context, persist_config)
+    with _shared_api_clients_lock:
+        api_client = _shared_api_clients.get(key)
+        if api_client is None:
+            api_client = _load_api_client(
+                config_file=config_file,
+                context=context,
+                persist_config=persist_config,
+            )
+            _shared_api_clients[key] = api_client
+    return api_client
+
+
+def _is_timeout(e):
+    """
+    Returns true if the exception is a request timeout. urllib3 retries reads
+    on timeouts, so they are usually reported as a MaxRetryError.
+    """
+    if isinstance(e, MaxRetryError):
+        e = e.reason
+    return isinstance(e, (HTTPTimeoutError, socket.timeout))
+
+
+# Thread pools used by the client, created on first use and keyed by purpose.
+# They are bounded, so they don't grow with the CPU count of the host.
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def _get_executor(name, max_workers):
+    with _executors_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix=f"paddlejob-{name}"
+            )
+            _executors[name] = executor
+    return executor
 
 
 class PaddleJobClient(object):
@@ -42,25 +139,54 @@ class PaddleJobClient(object):
         :param client_configuration: configuration for Kubernetes client
         :param persist_config:
         """
-        if config_file or not utils.is_running_in_k8s():
-            config.load_kube_config(
+        if client_configuration is None:
+            self._api_client_key = (config_file, context, persist_config)
+            api_client = _get_shared_api_client(
                 config_file=config_file,
                 context=context,
-                client_configuration=client_configuration,
                 persist_config=persist_config,
             )
         else:
-            config.load_incluster_config()
+            # A client with its own configuration doesn't share its ApiClient.
+            self._api_client_key = None
+            api_client = _load_api_client(
+                config_file=config_file,
+                context=context,
+                client_configuration=client_configuration,
+                persist_config=persist_config,
+            )
+        self._api_client = api_client
+
+        self.custom_api = client.CustomObjectsApi(api_client=api_client)
+        self.core_api = client.CoreV1Api(api_client=api_client)
 
-        self.custom_api = client.CustomObjectsApi()
-        self.core_api = client.CoreV1Api()
+        # Recently fetched PaddleJobs:
+        # (name, namespace, resource_version) -> (fetch time, paddlejob).
+        self._get_cache = {}
 
-    def create(self, paddlejob, namespace=utils.get_default_target_namespace()):
+    def close(self):
+        """
+        Close the ApiClient. Without a client_configuration, it is shared with the
+        other PaddleJobClient instances that use the same kubeconfig and context.
+        Those clients must not be used after this call; new PaddleJobClient
+        instances get a fresh ApiClient.
+        """
+        if self._api_client_key is None:
+            self._api_client.close()
+            return
+        with _shared_api_clients_lock:
+            api_client = _shared_api_clients.pop(self._api_client_key, None)
+        if api_client is not None:
+            api_client.close()
+
+    def create(self, paddlejob, namespace=None):
         """
         Create the PaddleJob
-        :param paddlejob: PaddleJob object
+        :param paddlejob: PaddleJob object or dict
         :param namespace: defaults to current or default namespace
         """
+        if namespace is None:
+            namespace = _default_namespace()
 
         try:
             self.custom_api.create_namespaced_custom_object(
@@ -69,6 +195,7 @@ class PaddleJobClient(object):
                 namespace,
                 constants.PADDLEJOB_PLURAL,
                 paddlejob,
+                _request_timeout=constants.APISERVER_TIMEOUT,
             )
         except client.rest.ApiException as e:
             raise RuntimeError(
@@ -76,8 +203,17 @@ class PaddleJobClient(object):
                  %s\n"
                 % e
             )
+        except (HTTPError, socket.timeout) as e:
+            if not _is_timeout(e):
+                raise
+            raise RuntimeError("Timeout trying to create PaddleJob.")
 
-        logging.info("PaddleJob {} has been created".format(paddlejob.metadata.name))
+        if isinstance(paddlejob, dict):
+            paddlejob_name = paddlejob["metadata"]["name"]
+        else:
+            paddlejob_name = paddlejob.metadata.name
+        self._forget_cached(paddlejob_name, namespace)
+        logger.info("PaddleJob %s has been created", paddlejob_name)
 
     def create_paddlejob_from_func(
         self,
@@ -85,7 +221,7 @@ class PaddleJobClient(object):
         func: Callable,
         parameters: Dict[str, Any] = None,
         base_image: str = constants.PADDLEJOB_BASE_IMAGE,
-        namespace: str = utils.get_default_target_namespace(),
+        namespace: str = None,
         num_worker_replicas: int = None,
         packages_to_install: List[str] = None,
         pip_index_url: str = "https://pypi.org/simple",
@@ -119,8 +255,11 @@ class PaddleJobClient(object):
                 f"Training function must be callable, got function type: {type(func)}"
             )
 
+        if namespace is None:
+            namespace = _default_namespace()
+
         # Get PaddleJob Pod template spec.
-        pod_template_spec = utils.get_pod_template_spec(
+        pod_template_spec = utils.get_pod_template_spec_dict(
             func=func,
             parameters=parameters,
             base_image=base_image,
@@ -129,44 +268,64 @@ class PaddleJobClient(object):
             pip_index_url=pip_index_url,
         )
 
-        # Create PaddleJob template.
-        paddlejob = models.KubeflowOrgV1PaddleJob(
-            api_version=f"{constants.KUBEFLOW_GROUP}/{constants.PADDLEJOB_VERSION}",
-            kind=constants.PADDLEJOB_KIND,
-            metadata=client.V1ObjectMeta(name=name, namespace=namespace),
-            spec=models.KubeflowOrgV1PaddleJobSpec(
-                run_policy=models.V1RunPolicy(clean_pod_policy=None),
-                paddle_replica_specs={},
-            ),
-        )
+        # Create PaddleJob template. The PaddleJob is built as a plain dict, so it
+        # is sent as is instead of being serialized through the models.
+        paddlejob = {
+            "apiVersion": f"{constants.KUBEFLOW_GROUP}/{constants.PADDLEJOB_VERSION}",
+            "kind": constants.PADDLEJOB_KIND,
+            "metadata": {"name": name, "namespace": namespace},
+            "spec": {
+                "runPolicy": {},
+                "paddleReplicaSpecs": {},
+            },
+        }
 
-        # Add Master and Worker replicas to the PaddleJob.
-        paddlejob.spec.paddle_replica_specs["Master"] = models.V1ReplicaSpec(
-            replicas=1, template=pod_template_spec,
-        )
+        # Add Master and Worker replicas to the PaddleJob. Both replicas reference
+        # the same Pod template dict on purpose, so it is built and sent once per
+        # replica without copies. Copy it with copy.deepcopy before changing the
+        # template of only one replica.
+        paddlejob["spec"]["paddleReplicaSpecs"]["Master"] = {
+            "replicas": 1,
+            "template": pod_template_spec,
+        }
 
         # If number of Worker replicas is 1, PaddleJob uses only Master replica.
         if num_worker_replicas != 1:
-            paddlejob.spec.paddle_replica_specs["Worker"] = models.V1ReplicaSpec(
-                replicas=num_worker_replicas, template=pod_template_spec,
-            )
+            paddlejob["spec"]["paddleReplicaSpecs"]["Worker"] = {
+                "replicas": num_worker_replicas,
+                "template": pod_template_spec,
+            }
 
         # Create PaddleJob
         self.create(paddlejob=paddlejob, namespace=namespace)
 
     def get(
-        self, name=None, namespace=None, watch=False, timeout_seconds=600
+        self,
+        name=None,
+        namespace=None,
+        watch=False,
+        timeout_seconds=600,
+        resource_version=None,
+        refresh=False,
     ):  # pylint: disable=inconsistent-return-statements
         """
         Get the paddlejob
+        A paddlejob fetched by name at the same resource_version less than
+        PADDLEJOB_GET_CACHE_TTL seconds ago by this client is returned from memory
+        and must not be modified.
         :param name: existing paddlejob name, if not defined, get all paddlejobs in the namespace.
         :param namespace: defaults to current or default namespace
         :param watch: Watch the paddlejob if `True`.
         :param timeout_seconds: How long to watch the paddlejob.
+        :param resource_version: (Optional): Resource version the read must be at
+               least as recent as. "0" lets the API server answer from its watch
+               cache instead of reading from etcd, which is cheaper but may return
+               a slightly stale paddlejob. By default the latest version is read.
+        :param refresh: Always get the paddlejob from the API server if `True`.
         :return: paddlejob
         """
         if namespace is None:
-            namespace = utils.get_default_target_namespace()
+            namespace = _default_namespace()
 
         if name:
             if watch:
@@ -174,31 +333,13 @@ class PaddleJobClient(object):
                     name=name, namespace=namespace, timeout_seconds=timeout_seconds
                 )
             else:
-                thread = self.custom_api.get_namespaced_custom_object(
-                    constants.KUBEFLOW_GROUP,
-                    constants.PADDLEJOB_VERSION,
-                    namespace,
-                    constants.PADDLEJOB_PLURAL,
-                    name,
-                    async_req=True,
+                paddlejob = self._get_by_name(
+                    name, namespace, resource_version=resource_version, refresh=refresh
                 )
-
-                paddlejob = None
-                try:
-                    paddlejob = thread.get(constants.APISERVER_TIMEOUT)
-                except multiprocessing.TimeoutError:
-                    raise RuntimeError("Timeout trying to get PaddleJob.")
-                except client.rest.ApiException as e:
+                if paddlejob is None:
                     raise RuntimeError(
-                        "Exception when calling CustomObjectsApi->get_namespaced_custom_object:\
-                        %s\n"
-                        % e
-                    )
-                except Exception as e:
-                    raise RuntimeError(
-                        "There was a problem to get PaddleJob {0} in namespace {1}. Exception: \
-                        {2} ".format(
-                            name, namespace, e
+                        "PaddleJob {0} not found in namespace {1}.".format(
+                            name, namespace
                         )
                     )
                 return paddlejob
@@ -206,19 +347,16 @@ class PaddleJobClient(object):
             if watch:
                 paddlejob_watch(namespace=namespace, timeout_seconds=timeout_seconds)
             else:
-                thread = self.custom_api.list_namespaced_custom_object(
-                    constants.KUBEFLOW_GROUP,
-                    constants.PADDLEJOB_VERSION,
-                    namespace,
-                    constants.PADDLEJOB_PLURAL,
-                    async_req=True,
-                )
-
                 paddlejob = None
                 try:
-                    paddlejob = thread.get(constants.APISERVER_TIMEOUT)
-                except multiprocessing.TimeoutError:
-                    raise RuntimeError("Timeout trying to get PaddleJob.")
+                    paddlejob = self.custom_api.list_namespaced_custom_object(
+                        constants.KUBEFLOW_GROUP,
+                        constants.PADDLEJOB_VERSION,
+                        namespace,
+                        constants.PADDLEJOB_PLURAL,
+                        resource_version=resource_version,
+                        _request_timeout=constants.APISERVER_TIMEOUT,
+                    )
                 except client.rest.ApiException as e:
                     raise RuntimeError(
                         "Exception when calling CustomObjectsApi->list_namespaced_custom_object: \
@@ -226,6 +364,8 @@ class PaddleJobClient(object):
                         % e
                     )
                 except Exception as e:
+                    if _is_timeout(e):
+                        raise RuntimeError("Timeout trying to get PaddleJob.")
                     raise RuntimeError(
                         "There was a problem to List PaddleJob in namespace {0}. \
                         Exception: {1} ".format(
@@ -235,6 +375,79 @@ class PaddleJobClient(object):
 
                 return paddlejob
 
+    def _get_by_name(self, name, namespace, resource_version=None, refresh=False):
+        """
+        Get the paddlejob by name like get(), but return None if it isn't found
+        at the resource version.
+        """
+        if not refresh:
+            fetched_at, paddlejob = self._get_cache.get(
+                (name, namespace, resource_version), (None, None)
+            )
+            if (
+                fetched_at is not None
+                and time.monotonic() - fetched_at < constants.PADDLEJOB_GET_CACHE_TTL
+            ):
+                return paddlejob
+
+        paddlejob = None
+        try:
+            if resource_version is None:
+                paddlejob = self.custom_api.get_namespaced_custom_object(
+                    constants.KUBEFLOW_GROUP,
+                    constants.PADDLEJOB_VERSION,
+                    namespace,
+                    constants.PADDLEJOB_PLURAL,
+                    name,
+                    _request_timeout=constants.APISERVER_TIMEOUT,
+                )
+            else:
+                # Only list requests accept a resource version.
+                paddlejobs = self.custom_api.list_namespaced_custom_object(
+                    constants.KUBEFLOW_GROUP,
+                    constants.PADDLEJOB_VERSION,
+                    namespace,
+                    constants.PADDLEJOB_PLURAL,
+                    field_selector=f"metadata.name={name}",
+                    resource_version=resource_version,
+                    _request_timeout=constants.APISERVER_TIMEOUT,
+                )
+                if paddlejobs.get("items"):
+                    paddlejob = paddlejobs["items"][0]
+        except client.rest.ApiException as e:
+            raise RuntimeError(
+                "Exception when calling CustomObjectsApi->get_namespaced_custom_object:\
+                %s\n"
+                % e
+            )
+        except Exception as e:
+            if _is_timeout(e):
+                raise RuntimeError("Timeout trying to get PaddleJob.")
+            raise RuntimeError(
+                "There was a problem to get PaddleJob {0} in namespace {1}. Exception: \
+                {2} ".format(
+                    name, namespace, e
+                )
+            )
+
+        if paddlejob is not None:
+            self._cache_paddlejob(name, namespace, resource_version, paddlejob)
+        return paddlejob
+
+    def _cache_paddlejob(self, name, namespace, resource_version, paddlejob):
+        """Remember the fetched PaddleJob and forget the expired ones."""
+        now = time.monotonic()
+        for key, (fetched_at, _) in list(self._get_cache.items()):
+            if now - fetched_at >= constants.PADDLEJOB_GET_CACHE_TTL:
+                self._get_cache.pop(key, None)
+        self._get_cache[(name, namespace, resource_version)] = (now, paddlejob)
+
+    def _forget_cached(self, name, namespace):
+        """Forget the PaddleJob fetched at any resource version."""
+        for key in list(self._get_cache):
+            if key[:2] == (name, namespace):
+                self._get_cache.pop(key, None)
+
     def patch(self, name, paddlejob, namespace=None):
         """
         Patch existing paddlejob
@@ -244,7 +457,8 @@ class PaddleJobClient(object):
         :return: patched paddlejob
         """
         if namespace is None:
-            namespace = utils.set_paddlejob_namespace(paddlejob)
+            namespace = utils.get_paddlejob_namespace(paddlejob) or _default_namespace()
+        self._forget_cached(name, namespace)
 
         try:
             outputs = self.custom_api.patch_namespaced_custom_object(
@@ -254,6 +468,7 @@ class PaddleJobClient(object):
                 constants.PADDLEJOB_PLURAL,
                 name,
                 paddlejob,
+                _request_timeout=constants.APISERVER_TIMEOUT,
             )
         except client.rest.ApiException as e:
             raise RuntimeError(
@@ -261,15 +476,22 @@ class PaddleJobClient(object):
                  %s\n"
                 % e
             )
+        except (HTTPError, socket.timeout) as e:
+            if not _is_timeout(e):
+                raise
+            raise RuntimeError("Timeout trying to patch PaddleJob.")
 
         return outputs
 
-    def delete(self, name, namespace=utils.get_default_target_namespace()):
+    def delete(self, name, namespace=None):
         """
         Delete the PaddleJob
         :param name: PaddleJob name
         :param namespace: defaults to current or default namespace
         """
+        if namespace is None:
+            namespace = _default_namespace()
+        self._forget_cached(name, namespace)
 
         try:
             self.custom_api.delete_namespaced_custom_object(
@@ -279,6 +501,7 @@ class PaddleJobClient(object):
                 plural=constants.PADDLEJOB_PLURAL,
                 name=name,
                 body=client.V1DeleteOptions(),
+                _request_timeout=constants.APISERVER_TIMEOUT,
             )
         except client.rest.ApiException as e:
             raise RuntimeError(
@@ -286,8 +509,12 @@ class PaddleJobClient(object):
                  %s\n"
                 % e
             )
+        except (HTTPError, socket.timeout) as e:
+            if not _is_timeout(e):
+                raise
+            raise RuntimeError("Timeout trying to delete PaddleJob.")
 
-        logging.info("PaddleJob {} has been deleted".format(name))
+        logger.info("PaddleJob %s has been deleted", name)
 
     def wait_for_job(
         self,
@@ -297,6 +524,8 @@ class PaddleJobClient(object):
         timeout_seconds=600,
         polling_interval=30,
         status_callback=None,
+        status_callbacks: Optional[List[Callable]] = None,
+        concurrent_callbacks=False,
     ):
         """Wait for the specified job to finish.
 
@@ -307,10 +536,14 @@ class PaddleJobClient(object):
         :param status_callback: (Optional): Callable. If supplied this callable is
                invoked after we poll the job. Callable takes a single argument which
                is the job.
+        :param status_callbacks: (Optional): List of Callables invoked like
+               status_callback. Callbacks should be fast, they run on every update.
+        :param concurrent_callbacks: Run the callbacks concurrently in a small thread
+               pool instead of one after the other, e.g. when they do I/O.
         :return:
         """
         if namespace is None:
-            namespace = utils.get_default_target_namespace()
+            namespace = _default_namespace()
 
         if watch:
             paddlejob_watch(
@@ -324,6 +557,8 @@ class PaddleJobClient(object):
                 timeout_seconds=timeout_seconds,
                 polling_interval=polling_interval,
                 status_callback=status_callback,
+                status_callbacks=status_callbacks,
+                concurrent_callbacks=concurrent_callbacks,
             )
 
     def wait_for_condition(
@@ -334,6 +569,8 @@ class PaddleJobClient(object):
         timeout_seconds=600,
         polling_interval=30,
         status_callback=None,
+        status_callbacks: Optional[List[Callable]] = None,
+        concurrent_callbacks=False,
     ):
         """Waits until any of the specified conditions occur.
 
@@ -342,34 +579,231 @@ class PaddleJobClient(object):
                supplied conditions is reached.
         :param namespace: defaults to current or default namespace.
         :param timeout_seconds: How long to wait for the job.
+        :param polling_interval: How often to poll for the status of the job if
+               the job can't be watched.
+        :param status_callback: (Optional): Callable. If supplied this callable is
+               invoked after every change of the job. Callable takes a single
+               argument which is the job.
+        :param status_callbacks: (Optional): List of Callables invoked like
+               status_callback. Callbacks should be fast, they run on every update.
+        :param concurrent_callbacks: Run the callbacks concurrently in a small thread
+               pool instead of one after the other, e.g. when they do I/O.
+        :return: Object: PaddleJob
+        """
+
+        if namespace is None:
+            namespace = _default_namespace()
+
+        # A monotonic deadline is immune to wall-clock jumps and accounts for the
+        # time spent in API calls and callbacks.
+        deadline = time.monotonic() + timeout_seconds
+        expected = frozenset(expected_condition)
+        callbacks = self._get_status_callbacks(status_callback, status_callbacks)
+
+        # Watch the PaddleJob, so condition changes are seen as soon as they
+        # happen. Fall back to polling if the watch can't be established.
+        # Status checks don't need consistent reads, so both are served from
+        # the API server cache (resource version "0").
+        paddlejob = None
+        poll = False
+        resource_version = "0"
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+
+                # The watch stream may be closed before the timeout, e.g. by a
+                # proxy or an API server restart. Watch again from the last seen
+                # resource version until the deadline.
+                received = False
+                w = k8s_watch.Watch()
+                for event in w.stream(
+                    self.custom_api.list_namespaced_custom_object,
+                    constants.KUBEFLOW_GROUP,
+                    constants.PADDLEJOB_VERSION,
+                    namespace,
+                    constants.PADDLEJOB_PLURAL,
+                    field_selector=f"metadata.name={name}",
+                    resource_version=resource_version,
+                    timeout_seconds=math.ceil(remaining),
+                    # Don't block on a half-open connection past the deadline.
+                    _request_timeout=remaining + constants.APISERVER_TIMEOUT,
+                ):
+                    if event["type"] == "ERROR":
+                        logger.warning(
+                            "Error event while watching PaddleJob %s: %s",
+                            name,
+                            event["object"],
+                        )
+                        poll = True
+                        break
+
+                    received = True
+                    paddlejob = event["object"]
+                    resource_version = paddlejob.get("metadata", {}).get(
+                        "resourceVersion", resource_version
+                    )
+                    self._run_status_callbacks(
+                        callbacks, paddlejob, concurrent_callbacks
+                    )
+
+                    if self._has_condition(paddlejob, expected):
+                        w.stop()
+                        return paddlejob
+
+                    if event["type"] == "DELETED":
+                        w.stop()
+                        raise RuntimeError(
+                            "PaddleJob {0} in namespace {1} was deleted before "
+                            "entering one of the conditions {2}.".format(
+                                name, namespace, expected_condition
+                            ),
+                            paddlejob,
+                        )
+
+                # Poll instead of reconnecting in a tight loop if the streams
+                # keep being closed without any event.
+                if poll or not received:
+                    poll = True
+                    break
+        except (client.rest.ApiException, HTTPError) as e:
+            logger.warning("Failed to watch PaddleJob %s: %s", name, e)
+            poll = True
+
+        if poll:
+            logger.warning("Polling PaddleJob %s for its conditions.", name)
+            while True:
+                # A PaddleJob created just now may not be in the cache yet.
+                paddlejob = self._get_by_name(name, namespace, resource_version="0")
+
+                if paddlejob:
+                    self._run_status_callbacks(
+                        callbacks, paddlejob, concurrent_callbacks
+                    )
+
+                    if self._has_condition(paddlejob, expected):
+                        return paddlejob
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                time.sleep(min(polling_interval, remaining))
+
+        raise RuntimeError(
+            "Timeout waiting for PaddleJob {0} in namespace {1} to enter one of the "
+            "conditions {2}.".format(name, namespace, expected_condition),
+            paddlejob,
+        )
+
+    async def wait_for_job_async(
+        self,
+        name,
+        namespace=None,
+        timeout_seconds=600,
+        polling_interval=30,
+        status_callback=None,
+        status_callbacks: Optional[List[Callable]] = None,
+        concurrent_callbacks=False,
+    ):
+        """Coroutine that waits for the specified job to finish.
+
+        See wait_for_condition_async, the event loop is not blocked while waiting.
+        :param name: Name of the PaddleJob.
+        :param namespace: defaults to current or default namespace.
+        :param timeout_seconds: How long to wait for the job.
         :param polling_interval: How often to poll for the status of the job.
         :param status_callback: (Optional): Callable. If supplied this callable is
                invoked after we poll the job. Callable takes a single argument which
                is the job.
+        :param status_callbacks: (Optional): List of Callables invoked like
+               status_callback. Callbacks should be fast, they run on every update.
+        :param concurrent_callbacks: Run the callbacks concurrently in a small thread
+               pool instead of one after the other, e.g. when they do I/O.
+        :return: Object: PaddleJob
+        """
+        return await self.wait_for_condition_async(
+            name,
+            ["Succeeded", "Failed"],
+            namespace=namespace,
+            timeout_seconds=timeout_seconds,
+            polling_interval=polling_interval,
+            status_callback=status_callback,
+            status_callbacks=status_callbacks,
+            concurrent_callbacks=concurrent_callbacks,
+        )
+
+    async def wait_for_condition_async(
+        self,
+        name,
+        expected_condition,
+        namespace=None,
+        timeout_seconds=600,
+        polling_interval=30,
+        status_callback=None,
+        status_callbacks: Optional[List[Callable]] = None,
+        concurrent_callbacks=False,
+    ):
+        """Coroutine that waits until any of the specified conditions occur.
+
+        The job is polled from a bounded thread pool and the coroutine sleeps with
+        asyncio.sleep, so the event loop keeps running other tasks meanwhile.
+        :param name: Name of the job.
+        :param expected_condition: A list of conditions. Function waits until any of the
+               supplied conditions is reached.
+        :param namespace: defaults to current or default namespace.
+        :param timeout_seconds: How long to wait for the job.
+        :param polling_interval: How often to poll for the status of the job.
+        :param status_callback: (Optional): Callable. If supplied this callable is
+               invoked after we poll the job. Callable takes a single argument which
+               is the job.
+        :param status_callbacks: (Optional): List of Callables invoked like
+               status_callback. Callbacks should be fast, they run on every update.
+        :param concurrent_callbacks: Run the callbacks concurrently in a small thread
+               pool instead of one after the other, e.g. when they do I/O.
         :return: Object: PaddleJob
         """
 
         if namespace is None:
-            namespace = utils.get_default_target_namespace()
+            namespace = _default_namespace()
 
-        for _ in range(round(timeout_seconds / polling_interval)):
+        loop = asyncio.get_running_loop()
+        executor = _get_executor("client", constants.ASYNC_MAX_WORKERS)
+        deadline = time.monotonic() + timeout_seconds
+        expected = frozenset(expected_condition)
+        callbacks = self._get_status_callbacks(status_callback, status_callbacks)
 
-            paddlejob = None
-            paddlejob = self.get(name, namespace=namespace)
+        while True:
+            # A PaddleJob created just now may not be in the cache yet.
+            paddlejob = await loop.run_in_executor(
+                executor,
+                functools.partial(
+                    self._get_by_name, name, namespace, resource_version="0"
+                ),
+            )
 
             if paddlejob:
-                if status_callback:
-                    status_callback(paddlejob)
-
-                # If we poll the CRD quick enough status won't have been set yet.
-                conditions = paddlejob.get("status", {}).get("conditions", [])
-                # Conditions might have a value of None in status.
-                conditions = conditions or []
-                for c in conditions:
-                    if c.get("type", "") in expected_condition:
-                        return paddlejob
+                if concurrent_callbacks:
+                    # Don't block the event loop while the callbacks run.
+                    await loop.run_in_executor(
+                        executor,
+                        self._run_status_callbacks,
+                        callbacks,
+                        paddlejob,
+                        concurrent_callbacks,
+                    )
+                else:
+                    self._run_status_callbacks(
+                        callbacks, paddlejob, concurrent_callbacks
+                    )
+
+                if self._has_condition(paddlejob, expected):
+                    return paddlejob
 
-            time.sleep(polling_interval)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            await asyncio.sleep(min(polling_interval, remaining))
 
         raise RuntimeError(
             "Timeout waiting for PaddleJob {0} in namespace {1} to enter one of the "
@@ -377,45 +811,113 @@ class PaddleJobClient(object):
             paddlejob,
         )
 
-    def get_job_status(self, name, namespace=None):
-        """Returns PaddleJob status, such as Running, Failed or Succeeded.
+    @staticmethod
+    def _get_status_callbacks(status_callback, status_callbacks):
+        """Returns all the status callbacks as one list."""
+        callbacks = [status_callback] if status_callback else []
+        callbacks.extend(status_callbacks or [])
+        return callbacks
 
+    @staticmethod
+    def _run_status_callbacks(callbacks, paddlejob, concurrent_callbacks):
+        """Invokes all the status callbacks with the PaddleJob in one pass."""
+        if concurrent_callbacks and len(callbacks) > 1:
+            executor = _get_executor("callbacks", constants.CALLBACKS_MAX_WORKERS)
+            futures = [executor.submit(callback, paddlejob) for callback in callbacks]
+            for future in futures:
+                future.result()
+        else:
+            for callback in callbacks:
+                callback(paddlejob)
+
+    @staticmethod
+    def _get_conditions(paddlejob):
+        """Returns the conditions of the PaddleJob, oldest first."""
+        # If we poll the CRD quick enough status won't have been set yet.
+        conditions = paddlejob.get("status", {}).get("conditions", [])
+        # Conditions might have a value of None in status.
+        return conditions or []
+
+    @staticmethod
+    def _has_condition(paddlejob, expected_condition):
+        """Returns true if the PaddleJob has any of the expected conditions."""
+        for c in PaddleJobClient._get_conditions(paddlejob):
+            if c.get("type") in expected_condition:
+                return True
+        return False
+
+    @staticmethod
+    def _get_last_condition_type(paddlejob):
+        """Returns the type of the latest PaddleJob condition, or "" if it has none."""
+        conditions = PaddleJobClient._get_conditions(paddlejob)
+        return "" if not conditions else conditions[-1].get("type", "")
+
+    def get_job_conditions(self, name, namespace=None, paddlejob=None):
+        """Returns the conditions of the PaddleJob.
+
+        Like get_job_status, the PaddleJob is read from the API server cache, so
+        the conditions may be stale right after a change.
         :param name: The PaddleJob name.
         :param namespace: defaults to current or default namespace.
-        :return: str: PaddleJob status
+        :param paddlejob: (Optional): PaddleJob object. If supplied the conditions
+               are read from it instead of getting the PaddleJob again.
+        :return: list: PaddleJob conditions
         """
-        if namespace is None:
-            namespace = utils.get_default_target_namespace()
+        if paddlejob is None:
+            paddlejob = self.get(name, namespace=namespace, resource_version="0")
+        return self._get_conditions(paddlejob)
 
-        paddlejob = self.get(name, namespace=namespace)
-        last_condition = paddlejob.get("status", {}).get("conditions", [])[-1]
-        return last_condition.get("type", "")
+    def get_job_status(self, name, namespace=None, paddlejob=None):
+        """Returns PaddleJob status, such as Running, Failed or Succeeded.
 
-    def is_job_running(self, name, namespace=None):
+        The PaddleJob is read from the API server cache, so right after it is
+        created or changed the status may be stale, or the PaddleJob may not be
+        found yet and RuntimeError is raised.
+        :param name: The PaddleJob name.
+        :param namespace: defaults to current or default namespace.
+        :param paddlejob: (Optional): PaddleJob object. If supplied the status
+               is read from it instead of getting the PaddleJob again.
+        :return: str: PaddleJob status, empty if the PaddleJob has no conditions yet
+        """
+        if paddlejob is None:
+            paddlejob = self.get(name, namespace=namespace, resource_version="0")
+        return self._get_last_condition_type(paddlejob)
+
+    def is_job_running(self, name, namespace=None, paddlejob=None):
         """Returns true if the PaddleJob running; false otherwise.
 
+        Like get_job_status, the result may be stale right after a change.
         :param name: The PaddleJob name.
         :param namespace: defaults to current or default namespace.
+        :param paddlejob: (Optional): PaddleJob object to check instead of getting
+               the PaddleJob again.
         :return: True or False
         """
-        paddlejob_status = self.get_job_status(name, namespace=namespace)
+        paddlejob_status = self.get_job_status(
+            name, namespace=namespace, paddlejob=paddlejob
+        )
         return paddlejob_status == constants.JOB_STATUS_RUNNING
 
-    def is_job_succeeded(self, name, namespace=None):
+    def is_job_succeeded(self, name, namespace=None, paddlejob=None):
         """Returns true if the PaddleJob succeeded; false otherwise.
 
+        Like get_job_status, the result may be stale right after a change.
         :param name: The PaddleJob name.
         :param namespace: defaults to current or default namespace.
+        :param paddlejob: (Optional): PaddleJob object to check instead of getting
+               the PaddleJob again.
         :return: True or False
         """
-        paddlejob_status = self.get_job_status(name, namespace=namespace)
+        paddlejob_status = self.get_job_status(
+            name, namespace=namespace, paddlejob=paddlejob
+        )
         return paddlejob_status == constants.JOB_STATUS_SUCCEEDED
 
     def get_pod_names(
         self,
         name,
         namespace=None,
-        master=False,  # pylint: disable=inconsistent-return-statements
+        master=False,
         replica_type=None,
         replica_index=None,
     ):
@@ -427,36 +929,39 @@ class PaddleJobClient(object):
         :param replica_type: User can specify one of 'master, worker' to only get one type pods.
                By default get all type pods.
         :param replica_index: User can specfy replica index to get one pod of PaddleJob.
-        :return: set: pods name
+        :return: set: pods name, empty if no Pods are found
         """
 
         if namespace is None:
-            namespace = utils.get_default_target_namespace()
+            namespace = _default_namespace()
 
-        labels = utils.get_job_labels(
-            name, master=master, replica_type=replica_type, replica_index=replica_index
-        )
+        if not master and replica_type is None and replica_index is None:
+            # All the job Pods, the selector only needs the group and job name.
+            selector = (
+                f"{constants.JOB_GROUP_LABEL}={constants.KUBEFLOW_GROUP},"
+                f"{constants.JOB_NAME_LABEL}={name}"
+            )
+        else:
+            selector = _selector_for(name, master, replica_type, replica_index)
 
         try:
-            resp = self.core_api.list_namespaced_pod(
-                namespace, label_selector=utils.to_selector(labels)
-            )
+            resp = self.core_api.list_namespaced_pod(namespace, label_selector=selector)
         except client.rest.ApiException as e:
             raise RuntimeError(
                 "Exception when calling CoreV1Api->read_namespaced_pod_log: %s\n" % e
             )
 
-        pod_names = []
-        for pod in resp.items:
-            if pod.metadata and pod.metadata.name:
-                pod_names.append(pod.metadata.name)
+        pod_names = {
+            pod.metadata.name
+            for pod in resp.items
+            if pod.metadata and pod.metadata.name
+        }
 
         if not pod_names:
-            logging.warning(
-                "Not found Pods of the PaddleJob %s with the labels %s.", name, labels
+            logger.warning(
+                "Not found Pods of the PaddleJob %s with the labels %s.", name, selector
             )
-        else:
-            return set(pod_names)
+        return pod_names
 
     def get_logs(
         self,
@@ -471,6 +976,7 @@ class PaddleJobClient(object):
         """
         Get training logs of the PaddleJob.
         By default only get the logs of Pod that has labels 'job-role: master'.
+        Every log line is logged as soon as it is read, see stream_logs.
         :param container: container name
         :param name: PaddleJob name
         :param namespace: defaults to current or default namespace.
@@ -480,11 +986,50 @@ class PaddleJobClient(object):
                By default get all type pods.
         :param replica_index: User can specfy replica index to get one pod of PaddleJob.
         :param follow: Follow the log stream of the pod. Defaults to false.
-        :return: str: pods logs
+        """
+
+        for pod, line in self.stream_logs(
+            name,
+            namespace=namespace,
+            master=master,
+            replica_type=replica_type,
+            replica_index=replica_index,
+            follow=follow,
+            container=container,
+        ):
+            logger.info("[Pod %s]: %s", pod, line)
+
+    def stream_logs(
+        self,
+        name,
+        namespace=None,
+        master=False,
+        replica_type=None,
+        replica_index=None,
+        follow=False,
+        container="paddle",
+    ) -> Iterator[Tuple[str, str]]:
+        """
+        Stream training logs of the PaddleJob line by line.
+        The logs of the matching Pods are read concurrently, by at most
+        LOGS_MAX_WORKERS threads unless they are followed, and their lines are
+        yielded as they arrive, so lines of different Pods are interleaved.
+        Only the lines that were not consumed yet are held in memory.
+        :param container: container name
+        :param name: PaddleJob name
+        :param namespace: defaults to current or default namespace.
+        :param master: By default get pod with label 'job-role: master' pod if True.
+                       If need to get more Pod Logs, set False.
+        :param replica_type: User can specify one of 'master, worker' to only get one type pods.
+               By default get all type pods.
+        :param replica_index: User can specfy replica index to get one pod of PaddleJob.
+        :param follow: Follow the log stream of the pods. Defaults to false. If true,
+               the iterator only ends when the log streams of all Pods end.
+        :return: Iterator of (pod name, log line) tuples.
         """
 
         if namespace is None:
-            namespace = utils.get_default_target_namespace()
+            namespace = _default_namespace()
 
         pod_names = self.get_pod_names(
             name,
@@ -494,20 +1039,124 @@ class PaddleJobClient(object):
             replica_index=replica_index,
         )
 
-        if pod_names:
-            for pod in pod_names:
-                try:
-                    pod_logs = self.core_api.read_namespaced_pod_log(
-                        pod, namespace, follow=follow, container=container
-                    )
-                    logging.info("The logs of Pod %s:\n %s", pod, pod_logs)
-                except client.rest.ApiException as e:
-                    raise RuntimeError(
-                        "Exception when calling CoreV1Api->read_namespaced_pod_log: %s\n"
-                        % e
-                    )
-        else:
+        if not pod_names:
             raise RuntimeError(
                 "Not found Pods of the PaddleJob {} "
                 "in namespace {}".format(name, namespace)
             )
+
+        lines = queue.Queue(maxsize=1000)
+        stop = threading.Event()
+
+        def put(item):
+            # Give up once the consumer has stopped iterating.
+            while not stop.is_set():
+                try:
+                    lines.put(item, timeout=1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        # Responses of the logs being read, closed when the consumer stops.
+        responses = set()
+
+        def read_pod_log(pod):
+            try:
+                resp = self._open_pod_log(pod, namespace, follow, container)
+            except Exception as e:  # pylint: disable=broad-except
+                put((pod, None, e))
+                return
+            responses.add(resp)
+            error = None
+            try:
+                # The consumer may have stopped before the response was added.
+                if stop.is_set():
+                    return
+                for line in self._pod_log_lines(resp):
+                    if not put((pod, line, None)):
+                        return
+            except Exception as e:  # pylint: disable=broad-except
+                error = e
+            finally:
+                responses.discard(resp)
+                resp.release_conn()
+            put((pod, None, error))
+
+        pods = queue.Queue()
+        for pod in pod_names:
+            pods.put(pod)
+
+        def read_pod_logs():
+            while not stop.is_set():
+                try:
+                    pod = pods.get_nowait()
+                except queue.Empty:
+                    return
+                read_pod_log(pod)
+
+        # Every call gets its own readers, so a consumer that stops iterating
+        # without closing the iterator can't block the readers of other calls.
+        # Followed log streams never end, so every Pod needs its own reader.
+        readers = (
+            len(pod_names)
+            if follow
+            else min(constants.LOGS_MAX_WORKERS, len(pod_names))
+        )
+        for _ in range(readers):
+            threading.Thread(target=read_pod_logs, daemon=True).start()
+
+        try:
+            running = len(pod_names)
+            while running:
+                pod, line, error = lines.get()
+                if line is not None:
+                    yield pod, line
+                    continue
+                running -= 1
+                if error is not None:
+                    raise error
+        finally:
+            stop.set()
+            # Unblock the readers waiting for more log, e.g. of followed Pods.
+            # urllib3 < 2.3 responses can only be closed.
+            for resp in list(responses):
+                try:
+                    if hasattr(resp, "shutdown"):
+                        resp.shutdown()
+                    else:
+                        resp.close()
+                except Exception:  # pylint: disable=broad-except
+                    pass
+
+    def _open_pod_log(self, pod, namespace, follow, container):
+        """Returns the response of the Pod log, its content is read lazily."""
+        try:
+            return self.core_api.read_namespaced_pod_log(
+                pod,
+                namespace,
+                follow=follow,
+                container=container,
+                _preload_content=False,
+            )
+        except client.rest.ApiException as e:
+            raise RuntimeError(
+                "Exception when calling CoreV1Api->read_namespaced_pod_log: %s\n" % e
+            )
+
+    @staticmethod
+    def _pod_log_lines(resp):
+        """
+        Yield the log lines of the Pod while they are read from the API server,
+        so the whole log is never held in memory.
+        """
+        # A chunk may end in the middle of a multi-byte character or of a line.
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        partial_line = ""
+        for chunk in resp.stream(65536):
+            lines = (partial_line + decoder.decode(chunk)).split("\n")
+            partial_line = lines.pop()
+            yield from lines
+        partial_line += decoder.decode(b"", final=True)
+        if partial_line:
+            yield partial_line
@@ -17,6 +17,12 @@ import os
 # General constants
 # How long to wait in seconds for requests to the ApiServer
 APISERVER_TIMEOUT = 120
+# Maximum number of threads used to fetch the logs of the job Pods
+LOGS_MAX_WORKERS = 32
+# Maximum number of threads coroutine variants of the clients run API calls in
+ASYNC_MAX_WORKERS = 8
+# Maximum number of threads status callbacks run in when they run concurrently
+CALLBACKS_MAX_WORKERS = 4
 KUBEFLOW_GROUP = "kubeflow.org"
 
 # TFJob K8S constants
@@ -57,6 +63,9 @@ PADDLEJOB_VERSION = os.environ.get("PADDLEJOB_VERSION", "v1")
 
 PADDLE_LOGLEVEL = os.environ.get("PADDLEJOB_LOGLEVEL", "INFO").upper()
 
+# How long in seconds PaddleJobClient.get() may return a PaddleJob from memory
+PADDLEJOB_GET_CACHE_TTL = 0.5
+
 PADDLEJOB_BASE_IMAGE = "docker.io/paddlepaddle/paddle:2.4.0rc0-gpu-cuda11.2-cudnn8.1-trt8.0"
 
 # XGBoostJob K8S constants
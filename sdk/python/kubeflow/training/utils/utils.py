@@ -66,6 +66,19 @@ def set_mxjob_namespace(mxjob):
     return namespace
 
 
+def get_paddlejob_namespace(paddlejob):
+    """Returns the namespace of the PaddleJob object or dict, None if it has none."""
+    if isinstance(paddlejob, dict):
+        return (paddlejob.get("metadata") or {}).get("namespace")
+    return paddlejob.metadata.namespace if paddlejob.metadata else None
+
+
+def set_paddlejob_namespace(paddlejob):
+    paddlejob_namespace = get_paddlejob_namespace(paddlejob)
+    namespace = paddlejob_namespace or get_default_target_namespace()
+    return namespace
+
+
 def get_job_labels(name, master=False, replica_type=None, replica_index=None):
     """
     Get labels according to specified flags.
@@ -119,16 +132,14 @@ def get_script_for_python_packages(packages_to_install, pip_index_url):
     return script_for_python_packages
 
 
-def get_pod_template_spec(
+def get_exec_script(
     func: Callable,
     parameters: Dict[str, Any],
-    base_image: str,
-    container_name: str,
     packages_to_install: List[str],
     pip_index_url: str,
 ):
     """
-    Get Pod template spec from the given function and input parameters.
+    Get the container script that executes the given function with the input parameters.
     """
 
     # Check if function is callable.
@@ -174,6 +185,28 @@ def get_pod_template_spec(
             + exec_script
         )
 
+    return exec_script
+
+
+def get_pod_template_spec(
+    func: Callable,
+    parameters: Dict[str, Any],
+    base_image: str,
+    container_name: str,
+    packages_to_install: List[str],
+    pip_index_url: str,
+):
+    """
+    Get Pod template spec from the given function and input parameters.
+    """
+
+    exec_script = get_exec_script(
+        func=func,
+        parameters=parameters,
+        packages_to_install=packages_to_install,
+        pip_index_url=pip_index_url,
+    )
+
     # Create Pod template spec.
     pod_template_spec = client.V1PodTemplateSpec(
         metadata=client.V1ObjectMeta(annotations={"sidecar.istio.io/inject": "false"}),
@@ -192,6 +225,41 @@ def get_pod_template_spec(
     return pod_template_spec
 
 
+def get_pod_template_spec_dict(
+    func: Callable,
+    parameters: Dict[str, Any],
+    base_image: str,
+    container_name: str,
+    packages_to_install: List[str],
+    pip_index_url: str,
+):
+    """
+    Get Pod template spec from the given function and input parameters as a dict
+    in the API server format, so it can be sent without model serialization.
+    """
+
+    exec_script = get_exec_script(
+        func=func,
+        parameters=parameters,
+        packages_to_install=packages_to_install,
+        pip_index_url=pip_index_url,
+    )
+
+    return {
+        "metadata": {"annotations": {"sidecar.istio.io/inject": "false"}},
+        "spec": {
+            "containers": [
+                {
+                    "name": container_name,
+                    "image": base_image,
+                    "command": ["bash", "-c"],
+                    "args": [exec_script],
+                }
+            ]
+        },
+    }
+
+
 class TableLogger:
     def __init__(self, header, column_format):
         self.header = header
@@ -25,6 +25,8 @@ REQUIRES = [
     "retrying>=1.3.3",
 ]
 
+ASYNC_REQUIRES = ["kubernetes_asyncio>=23.6.0"]
+
 setuptools.setup(
     name="kubeflow-training",
     version="1.5.0",
@@ -58,5 +60,5 @@ setuptools.setup(
     ],
     install_requires=REQUIRES,
     tests_require=TESTS_REQUIRES,
-    extras_require={"test": TESTS_REQUIRES},
+    extras_require={"test": TESTS_REQUIRES, "async": ASYNC_REQUIRES},
 )
@@ -0,0 +1,50 @@
+import asyncio
+import unittest
+from unittest import mock
+
+try:
+    from kubeflow.training.api import async_paddle_job_client
+    from kubeflow.training.api.async_paddle_job_client import AsyncPaddleJobClient
+except ImportError:  # kubernetes_asyncio is an optional dependency
+    async_paddle_job_client = None
+
+
+@unittest.skipIf(async_paddle_job_client is None, "requires kubernetes_asyncio")
+class TestAsyncPaddleJobClient(unittest.IsolatedAsyncioTestCase):
+    async def test_load_apis_once(self):
+        configuration = mock.Mock()
+        paddlejob_client = AsyncPaddleJobClient(
+            config_file="kubeconfig", client_configuration=configuration
+        )
+
+        async def load_kube_config(**kwargs):
+            await asyncio.sleep(0)
+
+        with mock.patch.object(
+            async_paddle_job_client.config,
+            "load_kube_config",
+            side_effect=load_kube_config,
+        ) as load, mock.patch.object(
+            async_paddle_job_client.client, "ApiClient"
+        ) as api_client:
+            await asyncio.gather(
+                paddlejob_client._load_apis(), paddlejob_client._load_apis()
+            )
+
+        self.assertEqual(load.call_count, 1)
+        api_client.assert_called_once_with(configuration=configuration)
+        self.assertIs(paddlejob_client.api_client, api_client.return_value)
+
+    async def test_get_job_status_without_conditions(self):
+        paddlejob_client = AsyncPaddleJobClient()
+        for conditions in ([], None):
+            with mock.patch.object(
+                paddlejob_client,
+                "get",
+                return_value={"status": {"conditions": conditions}},
+            ):
+                self.assertEqual(await paddlejob_client.get_job_status("test"), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
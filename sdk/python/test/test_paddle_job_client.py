@@ -0,0 +1,466 @@
+import asyncio
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from kubernetes import client
+from urllib3.exceptions import MaxRetryError, ProtocolError, ReadTimeoutError
+
+from kubeflow.training.api import paddle_job_client
+from kubeflow.training.constants import constants
+from kubeflow.training.api.paddle_job_client import PaddleJobClient
+
+
+def paddlejob(condition=None, resource_version="1"):
+    conditions = [{"type": condition}] if condition else []
+    return {
+        "metadata": {"name": "test", "resourceVersion": resource_version},
+        "status": {"conditions": conditions},
+    }
+
+
+def event(job, event_type="MODIFIED"):
+    return {"type": event_type, "object": job}
+
+
+class PodLogResponse(object):
+    def __init__(self, chunks, release=None):
+        self.chunks = chunks
+        self.release = release
+
+    def stream(self, amt):
+        if self.release is not None:
+            self.release.wait()
+        yield from self.chunks
+
+    def release_conn(self):
+        pass
+
+
+class TestPaddleJobClient(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(paddle_job_client, "_get_shared_api_client")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.client = PaddleJobClient()
+        self.client.custom_api = mock.MagicMock()
+        self.client.core_api = mock.MagicMock()
+
+    def mock_watch(self, *streams):
+        patcher = mock.patch.object(paddle_job_client.k8s_watch, "Watch")
+        watch_cls = patcher.start()
+        self.addCleanup(patcher.stop)
+        watch_cls.return_value.stream.side_effect = [iter(s) for s in streams]
+        return watch_cls.return_value.stream
+
+    def mock_list(self, *jobs):
+        self.client.custom_api.list_namespaced_custom_object.return_value = {
+            "items": list(jobs)
+        }
+
+    def mock_pods(self, count):
+        pods = [
+            SimpleNamespace(metadata=SimpleNamespace(name=f"test-worker-{i}"))
+            for i in range(count)
+        ]
+        self.client.core_api.list_namespaced_pod.return_value = SimpleNamespace(
+            items=pods
+        )
+
+    def test_wait_for_condition_watch(self):
+        stream = self.mock_watch(
+            [event(paddlejob("Created"), "ADDED"), event(paddlejob("Succeeded"))]
+        )
+
+        job = self.client.wait_for_condition("test", ["Succeeded"], namespace="ns")
+
+        self.assertEqual(job, paddlejob("Succeeded"))
+        self.assertEqual(stream.call_count, 1)
+        self.client.custom_api.list_namespaced_custom_object.assert_not_called()
+
+    def test_wait_for_condition_rewatch_closed_stream(self):
+        stream = self.mock_watch(
+            [event(paddlejob("Running", resource_version="5"), "ADDED")],
+            [event(paddlejob("Succeeded", resource_version="6"))],
+        )
+
+        job = self.client.wait_for_condition(
+            "test", ["Succeeded"], namespace="ns", timeout_seconds=600
+        )
+
+        self.assertEqual(job["status"]["conditions"][-1]["type"], "Succeeded")
+        self.assertEqual(stream.call_count, 2)
+        self.assertEqual(stream.call_args_list[0].kwargs["resource_version"], "0")
+        self.assertEqual(stream.call_args_list[1].kwargs["resource_version"], "5")
+        for call in stream.call_args_list:
+            self.assertLessEqual(call.kwargs["timeout_seconds"], 600)
+            self.assertIn("_request_timeout", call.kwargs)
+
+    def test_wait_for_condition_poll_empty_stream(self):
+        self.mock_watch([])
+        self.mock_list(paddlejob("Succeeded"))
+
+        job = self.client.wait_for_condition("test", ["Succeeded"], namespace="ns")
+
+        self.assertEqual(job, paddlejob("Succeeded"))
+
+    def test_wait_for_condition_poll_watch_error(self):
+        stream = self.mock_watch()
+        stream.side_effect = client.rest.ApiException(status=403)
+        self.mock_list(paddlejob("Failed"))
+
+        job = self.client.wait_for_condition(
+            "test", ["Succeeded", "Failed"], namespace="ns"
+        )
+
+        self.assertEqual(job, paddlejob("Failed"))
+
+    def test_wait_for_condition_poll_error_event(self):
+        self.mock_watch([event({"code": 410}, "ERROR")])
+        self.mock_list(paddlejob("Succeeded"))
+
+        job = self.client.wait_for_condition("test", ["Succeeded"], namespace="ns")
+
+        self.assertEqual(job, paddlejob("Succeeded"))
+
+    def test_wait_for_condition_deleted(self):
+        self.mock_watch(
+            [
+                event(paddlejob("Running"), "ADDED"),
+                event(paddlejob("Running"), "DELETED"),
+            ]
+        )
+
+        with self.assertRaisesRegex(RuntimeError, "was deleted"):
+            self.client.wait_for_condition("test", ["Succeeded"], namespace="ns")
+        self.client.custom_api.list_namespaced_custom_object.assert_not_called()
+
+    def test_wait_for_condition_deleted_with_condition(self):
+        self.mock_watch([event(paddlejob("Succeeded"), "DELETED")])
+
+        job = self.client.wait_for_condition("test", ["Succeeded"], namespace="ns")
+
+        self.assertEqual(job, paddlejob("Succeeded"))
+
+    def test_wait_for_condition_timeout(self):
+        self.mock_watch()
+        with self.assertRaises(RuntimeError):
+            self.client.wait_for_condition(
+                "test", ["Succeeded"], namespace="ns", timeout_seconds=0
+            )
+
+    def test_wait_for_condition_poll_not_found(self):
+        self.mock_watch([])
+        self.client.custom_api.list_namespaced_custom_object.side_effect = [
+            {"items": []},
+            {"items": [paddlejob("Succeeded")]},
+        ]
+
+        job = self.client.wait_for_condition(
+            "test", ["Succeeded"], namespace="ns", polling_interval=0
+        )
+
+        self.assertEqual(job, paddlejob("Succeeded"))
+
+    def test_get_job_status_not_found(self):
+        self.mock_list()
+
+        with self.assertRaisesRegex(RuntimeError, "not found"):
+            self.client.get_job_status("test", namespace="ns")
+
+    def test_get_job_conditions_and_status(self):
+        self.mock_list(paddlejob("Running"))
+
+        self.assertEqual(
+            self.client.get_job_conditions("test", namespace="ns"),
+            [{"type": "Running"}],
+        )
+        self.assertEqual(self.client.get_job_status("test", namespace="ns"), "Running")
+        # Both are read the same way, so the status comes from the cache.
+        self.assertEqual(
+            self.client.custom_api.list_namespaced_custom_object.call_count, 1
+        )
+
+    def test_get_timeout_after_retries(self):
+        timeout = ReadTimeoutError(None, "/paddlejobs/test", "Read timed out.")
+        self.client.custom_api.get_namespaced_custom_object.side_effect = (
+            MaxRetryError(None, "/paddlejobs/test", timeout)
+        )
+
+        with self.assertRaisesRegex(RuntimeError, "Timeout trying to get PaddleJob"):
+            self.client.get("test", namespace="ns")
+
+    def test_get_connection_error(self):
+        self.client.custom_api.get_namespaced_custom_object.side_effect = (
+            MaxRetryError(None, "/paddlejobs/test", ProtocolError("reset"))
+        )
+
+        with self.assertRaisesRegex(RuntimeError, "There was a problem"):
+            self.client.get("test", namespace="ns")
+
+    def test_create_timeout(self):
+        self.client.custom_api.create_namespaced_custom_object.side_effect = (
+            ReadTimeoutError(None, "/paddlejobs", "Read timed out.")
+        )
+
+        with self.assertRaisesRegex(RuntimeError, "Timeout trying to create"):
+            self.client.create(paddlejob("Created"), namespace="ns")
+
+    def test_stream_logs(self):
+        self.mock_pods(3)
+        self.client.core_api.read_namespaced_pod_log.side_effect = (
+            lambda pod, *args, **kwargs: PodLogResponse(
+                [f"{pod} line 1\n{pod} ".encode(), b"line 2\n"]
+            )
+        )
+
+        lines = sorted(self.client.stream_logs("test", namespace="ns"))
+
+        self.assertEqual(
+            lines,
+            sorted(
+                (f"test-worker-{i}", f"test-worker-{i} line {n}")
+                for i in range(3)
+                for n in (1, 2)
+            ),
+        )
+
+    def test_stream_logs_error(self):
+        self.mock_pods(1)
+        self.client.core_api.read_namespaced_pod_log.side_effect = (
+            client.rest.ApiException(status=500)
+        )
+
+        with self.assertRaises(RuntimeError):
+            list(self.client.stream_logs("test", namespace="ns"))
+
+    def test_stream_logs_stop(self):
+        self.mock_pods(300)
+        release = threading.Event()
+        self.addCleanup(release.set)
+        threads = threading.active_count()
+
+        first = threading.Lock()
+
+        def read_namespaced_pod_log(pod, *args, **kwargs):
+            # Only the first reader gets its log, the others block.
+            if first.acquire(blocking=False):
+                return PodLogResponse([b"first line\n"])
+            return PodLogResponse([b"line\n"], release=release)
+
+        read_pod_log = self.client.core_api.read_namespaced_pod_log
+        read_pod_log.side_effect = read_namespaced_pod_log
+
+        logs = self.client.stream_logs("test", namespace="ns")
+        self.assertEqual(next(logs)[1], "first line")
+        self.assertLessEqual(
+            threading.active_count() - threads, constants.LOGS_MAX_WORKERS
+        )
+        logs.close()
+        release.set()
+
+        self.wait_for_threads(threads)
+        # The reader of the first Pod may have started reading one more Pod.
+        self.assertLessEqual(read_pod_log.call_count, constants.LOGS_MAX_WORKERS + 1)
+
+    def test_stream_logs_not_consumed(self):
+        self.mock_pods(40)
+        self.client.core_api.read_namespaced_pod_log.side_effect = (
+            lambda pod, *args, **kwargs: PodLogResponse([b"line\n"] * 200)
+        )
+
+        # Readers of a partly consumed iterator must not block other calls.
+        logs = self.client.stream_logs("test", namespace="ns")
+        next(logs)
+        self.addCleanup(logs.close)
+
+        lines = list(self.client.stream_logs("test", namespace="ns"))
+        self.assertEqual(len(lines), 40 * 200)
+
+    def test_stream_logs_follow_stop(self):
+        self.mock_pods(3)
+        threads = threading.active_count()
+        first = threading.Lock()
+
+        def read_namespaced_pod_log(pod, *args, **kwargs):
+            if first.acquire(blocking=False):
+                return PodLogResponse([b"first line\n"])
+            # The log of a followed Pod blocks until the response is shut down.
+            release = threading.Event()
+            resp = PodLogResponse([], release=release)
+            resp.shutdown = release.set
+            return resp
+
+        self.client.core_api.read_namespaced_pod_log.side_effect = (
+            read_namespaced_pod_log
+        )
+
+        logs = self.client.stream_logs("test", namespace="ns", follow=True)
+        self.assertEqual(next(logs)[1], "first line")
+        logs.close()
+
+        self.wait_for_threads(threads)
+
+    def wait_for(self, condition, timeout=10):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+
+    def wait_for_threads(self, threads):
+        self.wait_for(lambda: threading.active_count() <= threads)
+
+    def test_patch_namespace(self):
+        patch_paddlejob = self.client.custom_api.patch_namespaced_custom_object
+        body = {"metadata": {"name": "test", "namespace": "ns"}}
+
+        self.client.patch("test", body)
+        self.assertEqual(patch_paddlejob.call_args.args[2], "ns")
+
+        with mock.patch.object(
+            paddle_job_client, "_default_namespace", return_value="default"
+        ):
+            self.client.patch("test", {"spec": {}})
+        self.assertEqual(patch_paddlejob.call_args.args[2], "default")
+
+    def test_get_cache(self):
+        get_paddlejob = self.client.custom_api.get_namespaced_custom_object
+        get_paddlejob.return_value = paddlejob("Running")
+
+        self.assertEqual(self.client.get("test", namespace="ns"), paddlejob("Running"))
+        self.assertEqual(self.client.get("test", namespace="ns"), paddlejob("Running"))
+        self.assertEqual(get_paddlejob.call_count, 1)
+
+        self.client.get("test", namespace="ns", refresh=True)
+        self.assertEqual(get_paddlejob.call_count, 2)
+
+        self.client.delete("test", namespace="ns")
+        self.client.get("test", namespace="ns")
+        self.assertEqual(get_paddlejob.call_count, 3)
+
+    def test_get_cache_resource_version(self):
+        self.mock_list(paddlejob("Created"))
+        self.client.custom_api.get_namespaced_custom_object.return_value = (
+            paddlejob("Running")
+        )
+
+        self.assertEqual(self.client.get_job_status("test", namespace="ns"), "Created")
+        # A stale read must not be returned to a consistent read.
+        self.assertEqual(self.client.get("test", namespace="ns"), paddlejob("Running"))
+
+    def test_get_cache_expired(self):
+        self.client.custom_api.get_namespaced_custom_object.side_effect = (
+            lambda *args, **kwargs: paddlejob(args[-1])
+        )
+
+        with mock.patch.object(paddle_job_client.time, "monotonic") as monotonic:
+            monotonic.return_value = 0
+            self.client.get("a", namespace="ns")
+            self.client.get("b", namespace="ns")
+            monotonic.return_value = constants.PADDLEJOB_GET_CACHE_TTL
+            self.client.get("c", namespace="ns")
+
+        self.assertEqual(list(self.client._get_cache), [("c", "ns", None)])
+
+    def test_wait_for_condition_async(self):
+        self.client.custom_api.list_namespaced_custom_object.side_effect = [
+            {"items": []},
+            {"items": [paddlejob("Running")]},
+            {"items": [paddlejob("Succeeded")]},
+        ]
+        status_callback = mock.Mock()
+
+        # Poll faster than the get() cache expires.
+        with mock.patch.object(constants, "PADDLEJOB_GET_CACHE_TTL", 0):
+            job = asyncio.run(
+                self.client.wait_for_condition_async(
+                    "test",
+                    ["Succeeded"],
+                    namespace="ns",
+                    polling_interval=0,
+                    status_callback=status_callback,
+                )
+            )
+
+        self.assertEqual(job, paddlejob("Succeeded"))
+        self.assertEqual(
+            status_callback.call_args_list,
+            [mock.call(paddlejob("Running")), mock.call(paddlejob("Succeeded"))],
+        )
+
+    def test_wait_for_job_async_concurrent_callbacks(self):
+        self.mock_list(paddlejob("Failed"))
+        callbacks = [mock.Mock(), mock.Mock()]
+
+        job = asyncio.run(
+            self.client.wait_for_job_async(
+                "test",
+                namespace="ns",
+                status_callbacks=callbacks,
+                concurrent_callbacks=True,
+            )
+        )
+
+        self.assertEqual(job, paddlejob("Failed"))
+        for callback in callbacks:
+            callback.assert_called_once_with(paddlejob("Failed"))
+
+    def test_wait_for_condition_async_timeout(self):
+        self.mock_list(paddlejob("Running"))
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(
+                self.client.wait_for_condition_async(
+                    "test", ["Succeeded"], namespace="ns", timeout_seconds=0
+                )
+            )
+
+
+
+class TestPaddleJobClientApiClient(unittest.TestCase):
+    def setUp(self):
+        for patcher in (
+            mock.patch.dict(paddle_job_client._shared_api_clients, clear=True),
+            mock.patch.object(paddle_job_client.config, "load_kube_config"),
+            mock.patch.object(paddle_job_client.client, "ApiClient"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.api_client = paddle_job_client.client.ApiClient
+        self.api_client.side_effect = lambda **kwargs: mock.Mock()
+
+    def test_shared_api_client(self):
+        first = PaddleJobClient(config_file="kubeconfig")
+        second = PaddleJobClient(config_file="kubeconfig")
+        other = PaddleJobClient(config_file="kubeconfig", context="other")
+
+        self.assertIs(first._api_client, second._api_client)
+        self.assertIsNot(first._api_client, other._api_client)
+        self.api_client.assert_called_with(configuration=None)
+
+    def test_client_configuration(self):
+        shared = PaddleJobClient(config_file="kubeconfig")
+        configuration = mock.Mock()
+        own = PaddleJobClient(
+            config_file="kubeconfig", client_configuration=configuration
+        )
+
+        self.assertIsNot(own._api_client, shared._api_client)
+        self.api_client.assert_called_with(configuration=configuration)
+        paddle_job_client.config.load_kube_config.assert_called_with(
+            config_file="kubeconfig",
+            context=None,
+            client_configuration=configuration,
+            persist_config=True,
+        )
+
+        own.close()
+        own._api_client.close.assert_called_once()
+        shared._api_client.close.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()